@@ -2,35 +2,582 @@
 
 import os
 import json
+import math
+import logging
+import asyncio
+import copy
+import time
+import threading
+import functools
+import contextlib
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Annotated, Any, Callable, Hashable, Iterator
 from google import genai
 from google.genai import types
 
-def _build_client_api_schema(schema_dict: dict) -> types.Schema:
+# Use the fastest JSON decoder available: orjson (parses straight from bytes),
+# then ujson where orjson has no wheels (e.g. PyPy, some ARM targets), then
+# the stdlib.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    try:
+        from ujson import loads as _loads
+    except ImportError:
+        from json import loads as _loads
+
+# When msgspec is installed, JSON responses are decoded straight into typed
+# structs built from the output schema, so parsing and validation happen in
+# a single pass.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# ijson is only needed by call_gemini_api_stream.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+# The environment's API key is read once, when the module is imported.
+_ENV_API_KEY = os.environ.get("GEMINI_API_KEY")
+
+# Responses for temperature=0.0 calls are deterministic for a given set of
+# inputs, so they are cached in-process. Set GEMINI_CACHE_DISABLE=1 to turn
+# this off, or GEMINI_CACHE_TTL to change the expiry (seconds, <= 0 = never).
+_CACHE_ENABLED = os.environ.get("GEMINI_CACHE_DISABLE", "").lower() not in ("1", "true", "yes")
+_DEFAULT_CACHE_TTL_SECONDS = 3600.0
+
+def _cache_ttl_from_env() -> float:
+    """Reads GEMINI_CACHE_TTL, falling back to the default when it isn't a number."""
+    raw = os.environ.get("GEMINI_CACHE_TTL")
+    if raw is None:
+        return _DEFAULT_CACHE_TTL_SECONDS
+    try:
+        ttl = float(raw)
+    except ValueError:
+        ttl = None
+    if ttl is None or math.isnan(ttl):
+        logger.warning(
+            "Ignoring invalid GEMINI_CACHE_TTL=%r; using %g seconds.",
+            raw, _DEFAULT_CACHE_TTL_SECONDS,
+        )
+        return _DEFAULT_CACHE_TTL_SECONDS
+    return ttl
+
+_CACHE_TTL_SECONDS = _cache_ttl_from_env()
+_CACHE_MAXSIZE = 256
+_RESPONSE_CACHE: "OrderedDict[Hashable, tuple[float, dict]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+cache_stats = {"hits": 0, "misses": 0, "local_hits": 0}
+
+_DICT_TAG = object()
+
+def _canon(obj: Any) -> Hashable:
     """
-    Recursively builds a genai.types.Schema object from a Python dictionary
-    for the genai.Client library.
+    Recursively converts dicts (with sorted keys) and lists into tuples, giving
+    a hashable structure that compares equal exactly when the inputs do. Dicts
+    are tagged so they can't collide with a list of pairs, and booleans so they
+    can't collide with 0/1.
     """
-    type_map = {
-        "string": types.Type.STRING, "number": types.Type.NUMBER,
-        "integer": types.Type.INTEGER, "boolean": types.Type.BOOLEAN,
-        "array": types.Type.ARRAY, "object": types.Type.OBJECT,
+    if isinstance(obj, dict):
+        return (_DICT_TAG, *sorted((k, _canon(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)):
+        return tuple([_canon(v) for v in obj])
+    if isinstance(obj, bool):
+        return (bool, obj)
+    return obj
+
+def _response_cache_key(
+    system_prompt: str,
+    user_message: str,
+    message_history: list[dict] | None,
+    schema_key: bytes | str | None,
+    model_name: str,
+) -> Hashable:
+    """
+    Builds a cache key from the inputs that determine a response. The key only
+    lives in this process's dict, so it is used as-is rather than digested.
+    The schema part keeps its key order (see `_schema_key`), since schemas
+    that differ only in property order produce differently ordered output.
+    """
+    payload = {
+        "model": model_name, "system": system_prompt, "history": message_history,
+        "user": user_message,
     }
+    if orjson:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), schema_key
+    return _canon(payload), schema_key
+
+def _cache_get(key: Hashable) -> dict | None:
+    with _CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(key)
+        if entry is None or (_CACHE_TTL_SECONDS > 0 and entry[0] < time.monotonic()):
+            if entry is not None:
+                del _RESPONSE_CACHE[key]
+            cache_stats["misses"] += 1
+            return None
+        _RESPONSE_CACHE.move_to_end(key)
+        cache_stats["hits"] += 1
+        # Hand out a copy so callers can't mutate the cached result.
+        return copy.deepcopy(entry[1])
+
+def _cache_put(key: Hashable, result: dict) -> None:
+    with _CACHE_LOCK:
+        _RESPONSE_CACHE[key] = (time.monotonic() + _CACHE_TTL_SECONDS, copy.deepcopy(result))
+        _RESPONSE_CACHE.move_to_end(key)
+        while len(_RESPONSE_CACHE) > _CACHE_MAXSIZE:
+            _RESPONSE_CACHE.popitem(last=False)
+
+def clear_response_cache() -> None:
+    """Empties the in-process response cache and resets its hit/miss counters."""
+    with _CACHE_LOCK:
+        _RESPONSE_CACHE.clear()
+        cache_stats["hits"] = cache_stats["misses"] = cache_stats["local_hits"] = 0
+
+# One genai.Client per API key, so its HTTP connection pool is reused across calls.
+_CLIENT_CACHE: dict[str, genai.Client] = {}
+_CLIENT_LOCK = threading.Lock()
+
+def _get_client(api_key: str) -> genai.Client:
+    """Returns the shared genai.Client for an API key, creating it on first use."""
+    client = _CLIENT_CACHE.get(api_key)
+    if client is None:
+        with _CLIENT_LOCK:
+            client = _CLIENT_CACHE.get(api_key)
+            if client is None:
+                client = _CLIENT_CACHE[api_key] = genai.Client(api_key=api_key)
+    return client
+
+# The async transport's connection pool is bound to the event loop it was
+# first used on, so async calls get one Client per (API key, running loop).
+_ASYNC_CLIENT_CACHE: dict[tuple[str, asyncio.AbstractEventLoop], genai.Client] = {}
+
+async def _get_async_client(api_key: str) -> genai.Client:
+    """Returns the genai.Client for an API key on the running event loop."""
+    cache_key = (api_key, asyncio.get_running_loop())
+    client = _ASYNC_CLIENT_CACHE.get(cache_key)
+    if client is not None:
+        return client
+
+    with _CLIENT_LOCK:
+        stale = [
+            _ASYNC_CLIENT_CACHE.pop(key)
+            for key in list(_ASYNC_CLIENT_CACHE) if key[1].is_closed()
+        ]
+        client = _ASYNC_CLIENT_CACHE.get(cache_key)
+        if client is None:
+            client = _ASYNC_CLIENT_CACHE[cache_key] = genai.Client(api_key=api_key)
+
+    # Clients left over from finished loops (e.g. an earlier asyncio.run) can't
+    # close their connections from this loop, but closing them here marks
+    # their pools closed, so the SDK's own cleanup doesn't fail later.
+    for old_client in stale:
+        with contextlib.suppress(RuntimeError):
+            await old_client.aio.aclose()
+    return client
+
+_TYPE_MAP = MappingProxyType({
+    "string": types.Type.STRING, "number": types.Type.NUMBER,
+    "integer": types.Type.INTEGER, "boolean": types.Type.BOOLEAN,
+    "array": types.Type.ARRAY, "object": types.Type.OBJECT,
+    "STRING": types.Type.STRING, "NUMBER": types.Type.NUMBER,
+    "INTEGER": types.Type.INTEGER, "BOOLEAN": types.Type.BOOLEAN,
+    "ARRAY": types.Type.ARRAY, "OBJECT": types.Type.OBJECT,
+})
+
+def _build_client_api_schema(schema_dict: dict) -> types.Schema:
+    """
+    Builds a genai.types.Schema object from a Python dictionary for the
+    genai.Client library. Nested properties and items are built first with an
+    explicit post-order walk, so deep schemas don't pay for a frame per node.
+    """
+    built = {}  # id(node) -> types.Schema
+    in_progress = set()
+    stack = [(schema_dict, False)]
+    while stack:
+        node, children_done = stack.pop()
+        node_id = id(node)
+        if not children_done:
+            if node_id in built:
+                continue
+            if node_id in in_progress:
+                raise ValueError("Schema contains a reference cycle")
+            in_progress.add(node_id)
+            stack.append((node, True))
+            props = node.get("properties")
+            if props:
+                stack.extend((child, False) for child in props.values())
+            it = node.get("items")
+            if it is not None:
+                stack.append((it, False))
+            continue
+
+        schema_type_str = node.get("type", "object")
+        gemini_type = _TYPE_MAP.get(schema_type_str)
+        if not gemini_type:
+            schema_type_str = schema_type_str.lower()
+            gemini_type = _TYPE_MAP.get(schema_type_str)
+            if not gemini_type:
+                raise ValueError(f"Unsupported schema type: {schema_type_str}")
+
+        props = node.get("properties")
+        properties = {k: built[id(v)] for k, v in props.items()} if props else None
+        it = node.get("items")
+        items = built[id(it)] if it is not None else None
+
+        in_progress.discard(node_id)
+        built[node_id] = types.Schema(
+            type=gemini_type,
+            description=node.get("description"),
+            properties=properties,
+            items=items,
+            required=node.get("required")
+        )
+    return built[id(schema_dict)]
+
+def _schema_key(schema_dict: dict | None) -> bytes | str | None:
+    """
+    Serializes a schema dictionary into a hashable key for the schema caches
+    (None when there is no schema, i.e. for plain-text calls). Key order is
+    kept, since it decides the order of properties in the output.
+    """
+    if not schema_dict:
+        return None
+    return orjson.dumps(schema_dict) if orjson else json.dumps(schema_dict)
+
+@functools.lru_cache(maxsize=128)
+def _compile_schema(schema_key: bytes | str) -> types.Schema:
+    """
+    Builds the genai.types.Schema for a schema key once, then reuses it.
+
+    The cached tree is shared by every call (and thread) using that schema
+    without being copied. That is safe: it is built from a fresh parse of the
+    key, so it never aliases the caller's dictionaries (types.Schema also
+    copies lists such as `required` into its own), and the SDK serializes it
+    with model_dump() before sending rather than modifying it.
+    """
+    return _build_client_api_schema(_loads(schema_key))
+
+def _schema_to_msgspec_type(schema_dict: dict, name: str = "Response") -> Any:
+    """
+    Recursively converts a schema dictionary into the equivalent msgspec type,
+    generating msgspec.Struct subclasses for objects with declared properties.
+    """
     schema_type_str = schema_dict.get("type", "object").lower()
-    gemini_type = type_map.get(schema_type_str)
-    if not gemini_type:
-        raise ValueError(f"Unsupported schema type: {schema_type_str}")
+    if schema_type_str == "object":
+        props = schema_dict.get("properties")
+        if not props:
+            return dict
+        required = set(schema_dict.get("required") or ())
+        fields, rename = [], {}
+        # Property names need not be valid identifiers, so every field gets a
+        # positional attribute name and is renamed back to the schema key.
+        for i, (prop_name, prop_schema) in enumerate(props.items()):
+            attr = f"f{i}"
+            rename[attr] = prop_name
+            field_type = _schema_to_msgspec_type(prop_schema, f"{name}_{attr}")
+            if prop_name in required:
+                fields.append((attr, field_type))
+            else:
+                # UNSET keeps "missing" and "null" apart, so optional keys are
+                # returned exactly as the model sent them.
+                fields.append((attr, field_type | None | msgspec.UnsetType, msgspec.UNSET))
+        # Keys outside the schema can't be kept by a struct, so they are
+        # rejected rather than silently dropped.
+        return msgspec.defstruct(
+            name, fields, kw_only=True, forbid_unknown_fields=True, rename=rename
+        )
+    if schema_type_str == "array":
+        items = schema_dict.get("items")
+        if items is None:
+            return list[Any]
+        return list[_schema_to_msgspec_type(items, f"{name}_item")]
+    return {
+        # JSON Schema counts integral floats such as 1.0 as integers.
+        "string": str, "number": int | float,
+        "integer": int | Annotated[float, msgspec.Meta(multiple_of=1)], "boolean": bool,
+    }.get(schema_type_str, Any)
 
-    properties = {k: _build_client_api_schema(v) for k, v in schema_dict.get("properties", {}).items()} or None
-    items = _build_client_api_schema(schema_dict["items"]) if "items" in schema_dict else None
-    
-    return types.Schema(
-        type=gemini_type,
-        description=schema_dict.get("description"),
-        properties=properties,
-        items=items,
-        required=schema_dict.get("required")
+@functools.lru_cache(maxsize=128)
+def _msgspec_decoder(schema_key: bytes | str) -> "msgspec.json.Decoder":
+    """Returns a cached typed decoder for a schema key."""
+    return msgspec.json.Decoder(_schema_to_msgspec_type(_loads(schema_key)))
+
+def _decode_json_response(response_text: str, schema_key: bytes | str) -> Any:
+    """Parses (and, with msgspec, validates) the model's JSON response."""
+    if msgspec is not None:
+        decoder = _msgspec_decoder(schema_key)
+        return msgspec.to_builtins(decoder.decode(response_text.encode()))
+    return _loads(response_text.encode() if orjson and isinstance(response_text, str) else response_text)
+
+def _resolve_api_key(api_key: str | None) -> str:
+    """Returns the API key to use, falling back to the environment."""
+    key_to_use = api_key or _ENV_API_KEY
+    if not key_to_use:
+        raise ValueError(
+            "A Gemini API key must be provided either as the 'api_key' parameter "
+            "or as the 'GEMINI_API_KEY' environment variable."
+        )
+    return key_to_use
+
+def _make_content(role: str, text: str) -> types.Content:
+    """Wraps a single conversation turn in a genai Content."""
+    return types.Content(role=role, parts=[types.Part(text=text)])
+
+def _build_contents(message_history: list[dict] | None, user_message: str) -> list[types.Content]:
+    """Converts the prior conversation turns plus the new user message into Contents."""
+    contents = [
+        types.Content(role=msg.get("role"), parts=[types.Part(text=msg.get("text"))])
+        for msg in message_history
+    ] if message_history else []
+    contents.append(_make_content("user", user_message))
+    return contents
+
+class Conversation:
+    """
+    A chat history held as ready-built genai Contents.
+
+    Passing a Conversation to `call_gemini_api` (or `acall_gemini_api`) instead
+    of `message_history` means each turn is converted once, when it is added,
+    rather than the whole history being rebuilt on every call. After a
+    successful call the user message and the model's reply are appended
+    automatically; a failed call leaves the conversation unchanged.
+
+    A Conversation is not safe to share between concurrent calls.
+    """
+
+    def __init__(self, message_history: list[dict] | None = None):
+        """
+        Args:
+            message_history (list[dict] | None, optional): Turns to start from,
+                in the same format as `call_gemini_api`'s `message_history`.
+        """
+        self._contents: list[types.Content] = []
+        for msg in message_history or ():
+            self.append(msg.get("role"), msg.get("text"))
+
+    def append(self, role: str, text: str) -> None:
+        """Adds a turn ('user' or 'model') to the end of the conversation."""
+        self._contents.append(_make_content(role, text))
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    def _begin_turn(self, user_message: str) -> list[types.Content]:
+        self.append("user", user_message)
+        return self._contents
+
+    def _end_turn(self, reply_text: str | None) -> None:
+        # The model may return no text (e.g. a blocked candidate); the turn
+        # still happened, so it is recorded as an empty reply.
+        self.append("model", reply_text or "")
+
+    def _rollback(self) -> None:
+        # A failed call drops the pending user message.
+        self._contents.pop()
+
+@functools.lru_cache(maxsize=64)
+def _system_part(system_prompt: str) -> types.Part:
+    """Returns the shared system-instruction Part for a system prompt."""
+    return types.Part(text=system_prompt)
+
+def _build_generation_config(
+    system_prompt: str, schema_key: bytes | str | None, temperature: float
+) -> types.GenerateContentConfig:
+    """Builds the request config for a schema key (None for plain text)."""
+    system_instruction = [_system_part(system_prompt)]
+    if schema_key is None:
+        # Plain text is the API's default, so no schema or MIME type is sent.
+        return types.GenerateContentConfig(
+            temperature=temperature,
+            system_instruction=system_instruction,
+        )
+
+    return types.GenerateContentConfig(
+        temperature=temperature,
+        response_mime_type="application/json",
+        response_schema=_compile_schema(schema_key),
+        system_instruction=system_instruction,
     )
 
+def _parse_response(response_text: str, schema_key: bytes | str | None) -> dict:
+    """Turns the model's response text into the dictionary handed back to callers."""
+    if schema_key is not None:
+        return _decode_json_response(response_text, schema_key)
+    return {"text": response_text}
+
+class ResponseTemplate:
+    """
+    A local extractor registered for one (system_prompt, output_schema) pair.
+
+    Workloads that send the same instructions and schema over and over, with
+    only the user message changing, often produce responses simple enough to
+    extract locally (with regular expressions, a rule set or a small local
+    model). The extractor is tried before Gemini and its answer is used only
+    when it reports at least `min_confidence`.
+    """
+
+    def __init__(
+        self,
+        extractor: Callable[[str], tuple[dict | None, float]],
+        min_confidence: float = 0.9,
+    ):
+        self.extractor = extractor
+        self.min_confidence = min_confidence
+
+# (system_prompt, schema key) -> ResponseTemplate
+_STRUCT_CACHE: dict[tuple[str, bytes | str], ResponseTemplate] = {}
+
+def register_local_extractor(
+    system_prompt: str,
+    output_schema: dict,
+    extractor: Callable[[str], tuple[dict | None, float]],
+    min_confidence: float = 0.9,
+) -> None:
+    """
+    Registers a local extractor for calls with this system prompt and schema.
+
+    Args:
+        system_prompt (str): The system prompt the extractor handles.
+        output_schema (dict): The output schema the extractor produces.
+        extractor (Callable[[str], tuple[dict | None, float]]): Called with the
+            user message; returns the extracted result (or None) and a
+            confidence between 0.0 and 1.0.
+        min_confidence (float, optional): The lowest confidence at which the
+            local result is returned instead of calling Gemini. Defaults to 0.9.
+
+    If the extractor raises, the error is logged and Gemini is called instead.
+    Confident results are checked against `output_schema` only when msgspec
+    is installed; without it they are returned to the caller unvalidated.
+    """
+    key = (system_prompt, _schema_key(output_schema))
+    _STRUCT_CACHE[key] = ResponseTemplate(extractor, min_confidence)
+
+def unregister_local_extractor(system_prompt: str, output_schema: dict) -> None:
+    """Removes the local extractor for a system prompt and schema, if any."""
+    _STRUCT_CACHE.pop((system_prompt, _schema_key(output_schema)), None)
+
+def _local_extract(system_prompt: str, user_message: str, schema_key: bytes | str) -> dict | None:
+    """
+    Returns a confident, schema-valid result from a registered local
+    extractor, or None when Gemini should be called instead.
+    """
+    template = _STRUCT_CACHE.get((system_prompt, schema_key))
+    if template is None:
+        return None
+    try:
+        result, confidence = template.extractor(user_message)
+        confident = result is not None and confidence >= template.min_confidence
+    except Exception:
+        # A broken extractor (including one returning a malformed pair or a
+        # non-numeric confidence) must not stop the call; fall through to Gemini.
+        logger.exception("Local extractor failed; falling back to the Gemini API")
+        return None
+    if not confident:
+        return None
+    if msgspec is not None:
+        try:
+            result = msgspec.to_builtins(msgspec.convert(result, _msgspec_decoder(schema_key).type))
+        except msgspec.ValidationError:
+            return None
+    with _CACHE_LOCK:
+        cache_stats["local_hits"] += 1
+    return result
+
+class _PreparedCall:
+    """The state carried from `_prepare_call` to `_finish_call` / `_fail_call`."""
+
+    def __init__(self, api_key: str, result: dict | None = None):
+        self.api_key = api_key
+        self.result = result  # Set when the call was answered without the API
+        self.request: dict = {}
+        self.schema_key: bytes | str | None = None
+        self.cache_key: Hashable | None = None
+        self.conversation: Conversation | None = None
+
+def _prepare_call(
+    system_prompt: str,
+    user_message: str,
+    message_history: list[dict] | None,
+    output_schema: dict | None,
+    model_name: str,
+    temperature: float,
+    api_key: str | None,
+    conversation: Conversation | None,
+) -> _PreparedCall:
+    """
+    Runs every step of `call_gemini_api` / `acall_gemini_api` that comes
+    before the request itself.
+    """
+    # 1. Determine the API key to use
+    key_to_use = _resolve_api_key(api_key)
+    if conversation is not None and message_history:
+        raise ValueError("Pass either 'message_history' or 'conversation', not both.")
+
+    # The schema is serialized once and the key reused by every step below
+    schema_key = _schema_key(output_schema)
+
+    # 2. Serve deterministic calls from the response cache when possible
+    #    (conversations are stateful, so they always go to the API)
+    cache_key = None
+    if _CACHE_ENABLED and temperature == 0.0 and conversation is None:
+        cache_key = _response_cache_key(
+            system_prompt, user_message, message_history, schema_key, model_name
+        )
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return _PreparedCall(key_to_use, cached)
+
+    # 3. Try a registered local extractor for this prompt and schema
+    if _STRUCT_CACHE and schema_key is not None and not message_history and conversation is None:
+        local_result = _local_extract(system_prompt, user_message, schema_key)
+        if local_result is not None:
+            return _PreparedCall(key_to_use, local_result)
+
+    call = _PreparedCall(key_to_use)
+    call.schema_key = schema_key
+    call.cache_key = cache_key
+    call.conversation = conversation
+
+    # 4. Build the Generation Configuration
+    generation_config = _build_generation_config(system_prompt, schema_key, temperature)
+
+    # 5. Construct the message history
+    if conversation is not None:
+        contents = conversation._begin_turn(user_message)
+    else:
+        contents = _build_contents(message_history, user_message)
+
+    call.request = {
+        "model": f"models/{model_name}",
+        "contents": contents,
+        "config": generation_config,
+    }
+    return call
+
+def _finish_call(call: _PreparedCall, response: types.GenerateContentResponse) -> dict:
+    """Parses a successful response and records it in the conversation and cache."""
+    result = _parse_response(response.text, call.schema_key)
+
+    if call.cache_key is not None:
+        _cache_put(call.cache_key, result)
+    # Last, so nothing after it can fail and leave a half-recorded turn.
+    if call.conversation is not None:
+        call.conversation._end_turn(response.text)
+    return result
+
+def _abort_call(call: _PreparedCall) -> None:
+    """Undoes the conversation turn of a call that didn't complete."""
+    if call.conversation is not None:
+        call.conversation._rollback()
+
 def call_gemini_api(
     system_prompt: str,
     user_message: str,
@@ -39,6 +586,7 @@ def call_gemini_api(
     model_name: str = "gemini-2.5-flash",
     temperature: float = 0.0,
     api_key: str | None = None,
+    conversation: Conversation | None = None,
 ) -> dict:
     """
     Calls the Google Gemini API with structured output support using the genai.Client.
@@ -48,6 +596,13 @@ def call_gemini_api(
     Gemini's native JSON mode, ensuring the model's output is a valid, parsable
     JSON object that conforms to a user-defined schema.
 
+    Calls made with `temperature=0.0` are deterministic, so their results are
+    cached in-process (see `cache_stats` and `clear_response_cache`). The cache
+    can be disabled with the 'GEMINI_CACHE_DISABLE' environment variable and its
+    expiry set with 'GEMINI_CACHE_TTL' (seconds). Single-turn JSON calls are
+    also offered to any extractor registered with `register_local_extractor`
+    for the same system prompt and schema before Gemini is called.
+
     Args:
         system_prompt (str): The main instruction or context for the model's
             behavior throughout the conversation.
@@ -68,7 +623,12 @@ def call_gemini_api(
             produce more creative results. Defaults to 0.0.
         api_key (str | None, optional): The Google Gemini API key. If provided,
             it will be used for authentication. If None, the function will
-            look for the 'GEMINI_API_KEY' environment variable. Defaults to None.
+            use the 'GEMINI_API_KEY' environment variable (as set when this
+            module was imported). Defaults to None.
+        conversation (Conversation | None, optional): A prebuilt chat history to
+            use instead of `message_history`. The user message and the model's
+            reply are appended to it after a successful call, and such calls
+            bypass the response cache. Defaults to None.
 
     Returns:
         dict: A Python dictionary representing the parsed JSON response from the
@@ -77,70 +637,243 @@ def call_gemini_api(
 
     Raises:
         ValueError: If the Gemini API key is not provided either as a parameter
-                    or as an environment variable.
+                    or as an environment variable, or if both `message_history`
+                    and `conversation` are given.
+        msgspec.ValidationError: If msgspec is installed and the model's JSON
+                    response does not match `output_schema`, including when
+                    it contains keys the schema doesn't declare.
         Exception: Propagates any exceptions that occur during the API call,
                    such as authentication or network errors.
     """
-    # 1. Determine the API key to use
-    key_to_use = api_key
-    if key_to_use is None:
-        key_to_use = os.environ.get("GEMINI_API_KEY")
-    
-    if not key_to_use:
-        raise ValueError(
-            "A Gemini API key must be provided either as the 'api_key' parameter "
-            "or as the 'GEMINI_API_KEY' environment variable."
-        )
+    call = _prepare_call(
+        system_prompt, user_message, message_history, output_schema,
+        model_name, temperature, api_key, conversation,
+    )
+    if call.result is not None:
+        return call.result
 
-    # 2. Initialize the Client
-    client = genai.Client(api_key=key_to_use)
-
-    # 3. Construct the message history
-    contents = []
-    if message_history:
-        for msg in message_history:
-            contents.append(types.Content(
-                role=msg.get("role"),
-                parts=[types.Part.from_text(text=msg.get("text"))]
-            ))
-    contents.append(types.Content(
-        role="user",
-        parts=[types.Part.from_text(text=user_message)]
-    ))
+    # Make the API call
+    completed = False
+    try:
+        client = _get_client(call.api_key)
+        response = client.models.generate_content(**call.request)
+        result = _finish_call(call, response)
+        completed = True
+        return result
+    except Exception:
+        logger.exception("Gemini API call failed")
+        raise
+    finally:
+        # Also covers KeyboardInterrupt, which isn't an Exception.
+        if not completed:
+            _abort_call(call)
 
-    # 4. Build the Generation Configuration
-    response_schema = None
-    response_mime_type = "text/plain"
-    if output_schema:
-        response_schema = _build_client_api_schema(output_schema)
-        response_mime_type = "application/json"
+async def acall_gemini_api(
+    system_prompt: str,
+    user_message: str,
+    message_history: list[dict] | None = None,
+    output_schema: dict | None = None,
+    model_name: str = "gemini-2.5-flash",
+    temperature: float = 0.0,
+    api_key: str | None = None,
+    conversation: Conversation | None = None,
+) -> dict:
+    """
+    Asynchronous version of `call_gemini_api`.
 
-    generation_config = types.GenerateContentConfig(
-        temperature=temperature,
-        response_mime_type=response_mime_type,
-        response_schema=response_schema,
-        system_instruction=[types.Part.from_text(text=system_prompt)],
+    Takes the same arguments, returns the same result and shares the same
+    response cache, but awaits the request through the client's asyncio
+    interface so many calls can be in flight at once.
+    """
+    call = _prepare_call(
+        system_prompt, user_message, message_history, output_schema,
+        model_name, temperature, api_key, conversation,
     )
-    
-    # 5. Make the API call
+    if call.result is not None:
+        return call.result
+
+    # Make the API call
+    completed = False
     try:
-        response = client.models.generate_content(
-            model=f"models/{model_name}",
-            contents=contents,
-            config=generation_config,
-        )
-        
-        response_text = response.text
-        
-        if output_schema:
-            return json.loads(response_text)
-        else:
-            return {"text": response_text}
-
-    except Exception as e:
-        print(f"An error occurred during the Gemini API call: {e}")
+        client = await _get_async_client(call.api_key)
+        response = await client.aio.models.generate_content(**call.request)
+        result = _finish_call(call, response)
+        completed = True
+        return result
+    except Exception:
+        logger.exception("Gemini API call failed")
+        raise
+    finally:
+        # Also covers cancellation (asyncio.CancelledError isn't an Exception).
+        if not completed:
+            _abort_call(call)
+
+async def call_gemini_api_batch(requests: list[dict], concurrency: int = 8) -> list:
+    """
+    Runs many Gemini API calls concurrently.
+
+    Args:
+        requests (list[dict]): One dictionary of `call_gemini_api` keyword
+            arguments per call.
+        concurrency (int, optional): The maximum number of requests in flight
+            at any one time. Keep this modest; unbounded parallelism tends to
+            run into rate limits and timeouts. Defaults to 8.
+
+    Returns:
+        list: The results in the same order as `requests`. A call that failed
+              is represented by its exception instead of a dictionary.
+
+    Raises:
+        ValueError: If `concurrency` is less than 1.
+    """
+    if concurrency < 1:
+        raise ValueError(f"'concurrency' must be at least 1, got {concurrency}.")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(request: dict) -> dict:
+        async with semaphore:
+            return await acall_gemini_api(**request)
+
+    return await asyncio.gather(*map(_run, requests), return_exceptions=True)
+
+def call_gemini_api_stream(
+    system_prompt: str,
+    user_message: str,
+    *,
+    output_schema: dict,
+    message_history: list[dict] | None = None,
+    item_path: str = "item",
+    model_name: str = "gemini-2.5-flash",
+    temperature: float = 0.0,
+    api_key: str | None = None,
+) -> Iterator[Any]:
+    """
+    Streams a structured JSON response, yielding objects as soon as they are
+    complete rather than waiting for the whole response.
+
+    The response is requested with `generate_content_stream` and its chunks are
+    fed into an incremental ijson parser, so only the object currently being
+    parsed is held in memory and the caller can start working on early items
+    while the model is still generating later ones. Results are neither cached
+    nor validated against the schema. Arguments after `user_message` are
+    keyword-only.
+
+    Args:
+        system_prompt (str): The main instruction or context for the model.
+        user_message (str): The latest message from the user.
+        output_schema (dict): The expected JSON structure of the response.
+        message_history (list[dict] | None, optional): Prior conversation turns,
+            as for `call_gemini_api`. Defaults to None.
+        item_path (str, optional): The ijson prefix of the objects to yield.
+            "item" yields the elements of a top-level array; for an array
+            under an "invoices" key use "invoices.item". Defaults to "item".
+        model_name (str, optional): The Gemini model to use.
+            Defaults to "gemini-2.5-flash".
+        temperature (float, optional): The generation temperature.
+            Defaults to 0.0.
+        api_key (str | None, optional): The Google Gemini API key. Falls back
+            to the 'GEMINI_API_KEY' environment variable. Defaults to None.
+
+    Returns:
+        Iterator[Any]: An iterator over the parsed objects found at
+            `item_path`, in order. The request is sent when iteration starts.
+
+    Raises:
+        ImportError: If the 'ijson' package is not installed.
+        ValueError: If no API key is available or `output_schema` is empty.
+    """
+    if ijson is None:
+        raise ImportError("call_gemini_api_stream requires the 'ijson' package (pip install ijson).")
+    if not output_schema:
+        raise ValueError("call_gemini_api_stream requires an 'output_schema'.")
+
+    key_to_use = _resolve_api_key(api_key)
+    client = _get_client(key_to_use)
+    contents = _build_contents(message_history, user_message)
+    generation_config = _build_generation_config(
+        system_prompt, _schema_key(output_schema), temperature
+    )
+
+    # The checks and set-up above run when the function is called; only the
+    # request itself is deferred until the caller starts iterating.
+    return _stream_items(client, {
+        "model": f"models/{model_name}",
+        "contents": contents,
+        "config": generation_config,
+    }, item_path)
+
+def _stream_items(client: genai.Client, request: dict, item_path: str) -> Iterator[Any]:
+    """Streams a response through an incremental ijson parser, yielding items as they complete."""
+    items = ijson.sendable_list()
+    parser = ijson.items_coro(items, item_path, use_float=True)
+    try:
+        for chunk in client.models.generate_content_stream(**request):
+            if chunk.text:
+                parser.send(chunk.text.encode())
+                yield from items
+                del items[:]
+        parser.close()
+        yield from items
+
+    except Exception:
+        logger.exception("Gemini API call failed")
         raise
 
+def make_gemini_caller(
+    system_prompt: str,
+    output_schema: dict | None = None,
+    model_name: str = "gemini-2.5-flash",
+    temperature: float = 0.0,
+    api_key: str | None = None,
+) -> Callable[..., dict]:
+    """
+    Builds a call function specialized for a fixed system prompt, schema and model.
+
+    Everything that doesn't depend on the user message (the client, the model
+    path, the compiled schema and the generation config) is prepared once, up
+    front, so each call only has to wrap the new message and send it. This is
+    the fastest option for servers that always use the same settings. Calls
+    made this way skip the response cache and local extractors.
+
+    Args:
+        system_prompt (str): The main instruction or context for the model.
+        output_schema (dict | None, optional): The expected JSON structure of
+            the response, or None for plain text. Defaults to None.
+        model_name (str, optional): The Gemini model to use.
+            Defaults to "gemini-2.5-flash".
+        temperature (float, optional): The generation temperature.
+            Defaults to 0.0.
+        api_key (str | None, optional): The Google Gemini API key. Falls back
+            to the 'GEMINI_API_KEY' environment variable. Defaults to None.
+
+    Returns:
+        Callable[..., dict]: A function `fast_call(user_message, history=None)`
+            that returns the same result as `call_gemini_api`, where `history`
+            has the same format as `message_history`.
+
+    Raises:
+        ValueError: If no API key is available or the schema is invalid.
+    """
+    client = _get_client(_resolve_api_key(api_key))
+    model = f"models/{model_name}"
+    schema_key = _schema_key(output_schema)
+    generation_config = _build_generation_config(system_prompt, schema_key, temperature)
+
+    def fast_call(user_message: str, history: list[dict] | None = None) -> dict:
+        try:
+            response = client.models.generate_content(
+                model=model,
+                contents=_build_contents(history, user_message),
+                config=generation_config,
+            )
+            return _parse_response(response.text, schema_key)
+
+        except Exception:
+            logger.exception("Gemini API call failed")
+            raise
+
+    return fast_call
+
 if __name__ == '__main__':
     # This block demonstrates how to use the call_gemini_api function.
     # It will only run when the script is executed directly.